@@ -10,21 +10,37 @@
 
 from pathlib import Path
 import os
+import shutil
+import struct
+import threading
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
+from urllib.parse import quote, urlencode
 
-from qgis.PyQt.QtCore import QUrl, QEventLoop, QStandardPaths
-from qgis.PyQt.QtWidgets import QApplication, QTextEdit, QLabel, QProgressBar
-from qgis.PyQt.QtNetwork import QNetworkRequest
+from qgis.PyQt.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, QTimer, QUrl, QStandardPaths, pyqtSignal
+)
+from qgis.PyQt.QtWidgets import QTextEdit, QLabel, QProgressBar
+from qgis.PyQt.QtNetwork import QNetworkRequest, QNetworkReply
 from qgis.core import (
+    QgsApplication,
     QgsProject,
     QgsRasterLayer,
     QgsSingleBandGrayRenderer,
     QgsContrastEnhancement,
     QgsRasterBandStats,
     QgsNetworkAccessManager,
+    QgsTask,
 )
 
+try:
+    # Optional: libdeflate bindings ('deflate' on PyPI) inflate noticeably faster than zlib.
+    import deflate
+except ImportError:
+    deflate = None
+
 # ---------------------------- Configuration ----------------------------
 
 # INEGI "DownloadFile.do" endpoint for state-based CEM downloads (ZIP packages).
@@ -36,6 +52,47 @@ BUILD_TAG = "20170619"
 # Resolutions offered by INEGI for state ZIPs (meters).
 RES_LIST = [15, 30, 60, 90, 120]
 
+# File extensions of the raster formats shipped inside CEM packages.
+RASTER_EXTS = frozenset((".tif", ".tiff", ".bil", ".img"))
+
+# Empty file written next to an extracted package once unzip_all has completed.
+UNZIP_MARKER = ".cem_descomprimido"
+
+# Pixels sampled for Min/Max statistics before falling back to a full-extent scan.
+STATS_SAMPLE_SIZE = 250000
+
+# Minimum interval between progress repaints while downloading (~30 Hz).
+UI_REFRESH_MS = 33
+
+# Maximum bytes pulled from a network reply per read call (1 MiB).
+READ_CHUNK_SIZE = 1 << 20
+
+# Concurrent byte-range GETs used for large downloads on servers accepting ranges.
+RANGE_PARTS = 4
+
+# Files smaller than this are fetched with a single GET (8 MiB).
+RANGE_MIN_SIZE = 8 << 20
+
+# Qt-side buffering requested for network replies (4 MiB).
+NETWORK_BUFFER_SIZE = 4 << 20
+
+# Userspace write buffer for downloaded files, coalesces small chunk writes (1 MiB).
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Read size used when streaming ZIP members to disk (1 MiB).
+EXTRACT_CHUNK_SIZE = 1 << 20
+
+# Largest ZIP member inflated in one shot with libdeflate (64 MiB), and how many such
+# inflates may hold their compressed + inflated bytes in memory at once. Larger members,
+# or members arriving while every slot is busy, stream through zlib instead.
+LIBDEFLATE_MAX_MEMBER_SIZE = 64 << 20
+LIBDEFLATE_MAX_INFLIGHT = 2
+
+# Fixed part of a ZIP local file header (signature through extra-field length).
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+_LIBDEFLATE_SLOTS = threading.BoundedSemaphore(LIBDEFLATE_MAX_INFLIGHT)
+
 
 # ------------------------------ Utilities ------------------------------
 
@@ -50,6 +107,16 @@ def plugin_temp_dir() -> Path:
     return d
 
 
+def zip_cache_path(cve: str, res_m: int) -> Path:
+    """
+    Returns the persistent cache location of a state ZIP, named after INEGI's own file
+    naming so that a new BUILD_TAG never reuses stale packages.
+    """
+    d = plugin_temp_dir() / "zip_cache"
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"CEM_V3_{BUILD_TAG}_R{res_m}_E{cve}.zip"
+
+
 def log_append(widget: QTextEdit, msg: str) -> None:
     """
     Appends a message to the QTextEdit log and keeps the cursor visible.
@@ -58,12 +125,113 @@ def log_append(widget: QTextEdit, msg: str) -> None:
     widget.ensureCursorVisible()
 
 
+def drop_page_cache(path: Path) -> None:
+    """
+    Hints the OS to evict a file we are done with from the page cache, so it does not
+    compete with the raster data read while styling. No-op where posix_fadvise is missing.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _member_target(out_dir: Path, name: str) -> Path:
+    """
+    Maps an archive member name to its path under out_dir, dropping drive letters,
+    absolute prefixes and '..' components the same way ZipFile.extract does.
+    """
+    name = os.path.splitdrive(name.replace("\\", "/"))[1]
+    parts = [p for p in name.split("/") if p not in ("", ".", "..")]
+    return out_dir.joinpath(*parts)
+
+
+def _can_inflate_with_libdeflate(info: zipfile.ZipInfo) -> bool:
+    """
+    True if the member can be inflated in one shot by libdeflate: plain (unencrypted)
+    DEFLATE and small enough to hold compressed + inflated bytes in memory.
+    """
+    return (
+        deflate is not None
+        and info.compress_type == zipfile.ZIP_DEFLATED
+        and not info.flag_bits & 0x1
+        and info.file_size <= LIBDEFLATE_MAX_MEMBER_SIZE
+    )
+
+
+def _inflate_with_libdeflate(zip_path: Path, info: zipfile.ZipInfo) -> bytes:
+    """
+    Reads a member's raw DEFLATE stream straight from the archive and inflates it with
+    libdeflate. The CRC-32 is verified just like ZipFile does.
+    """
+    with open(zip_path, "rb") as fp:
+        fp.seek(info.header_offset)
+        header = fp.read(_ZIP_LOCAL_HEADER_SIZE)
+        if len(header) != _ZIP_LOCAL_HEADER_SIZE or header[:4] != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"Encabezado local inválido: {info.filename}")
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        fp.seek(name_len + extra_len, os.SEEK_CUR)
+        compressed = fp.read(info.compress_size)
+
+    data = deflate.deflate_decompress(compressed, info.file_size)
+    if zlib.crc32(data) != info.CRC:
+        raise zipfile.BadZipFile(f"CRC inválido: {info.filename}")
+    return data
+
+
+def _extract_member(zip_path: Path, name: str, out_dir: Path) -> None:
+    """
+    Extracts a single member through its own ZipFile handle, so it is safe to run
+    concurrently with other members of the same archive. Uses libdeflate when available
+    and one of the LIBDEFLATE_MAX_INFLIGHT slots is free, which bounds peak memory.
+    """
+    target = _member_target(out_dir, name)
+    with zipfile.ZipFile(str(zip_path), "r") as z:
+        info = z.getinfo(name)
+        if not (_can_inflate_with_libdeflate(info) and _LIBDEFLATE_SLOTS.acquire(blocking=False)):
+            # Stream in 1 MiB pieces; extract() would copy through a small internal buffer.
+            with z.open(info) as src, open(target, "wb", buffering=0) as dst:
+                shutil.copyfileobj(src, dst, length=EXTRACT_CHUNK_SIZE)
+            return
+
+    try:
+        data = _inflate_with_libdeflate(zip_path, info)
+        with open(target, "wb") as dst:
+            dst.write(data)
+        data = None
+    finally:
+        _LIBDEFLATE_SLOTS.release()
+
+
 def unzip_all(zip_path: Path, out_dir: Path) -> None:
     """
     Extracts the entire ZIP archive into the provided output directory.
+    Directories are created upfront; file members are inflated in parallel.
     """
     with zipfile.ZipFile(str(zip_path), "r") as z:
-        z.extractall(str(out_dir))
+        members = z.infolist()
+
+    names: list[str] = []
+    for m in members:
+        target = _member_target(out_dir, m.filename)
+        if m.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            names.append(m.filename)
+    if not names:
+        return
+
+    workers = min(len(names), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        # Consume the iterator so worker exceptions propagate to the caller.
+        list(ex.map(lambda name: _extract_member(zip_path, name, out_dir), names))
 
 
 def guess_raster_files(root: Path) -> list[Path]:
@@ -71,89 +239,354 @@ def guess_raster_files(root: Path) -> list[Path]:
     Recursively scans 'root' for raster files typically found in CEM packages.
     Returns a list of candidate raster paths.
     """
-    exts = {".tif", ".tiff", ".bil", ".img"}
     out: list[Path] = []
-    for r, _, fns in os.walk(root):
-        for fn in fns:
-            if Path(fn).suffix.lower() in exts:
-                out.append(Path(r) / fn)
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(e.path)
+                else:
+                    dot = e.name.rfind(".")
+                    if dot >= 0 and e.name[dot:].lower() in RASTER_EXTS:
+                        out.append(Path(e.path))
     return out
 
 
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+
 def human_size(n: float) -> str:
     """
     Formats a byte count into a human-readable string.
     """
-    units = ["B", "KB", "MB", "GB", "TB"]
-    f = float(n)
-    for u in units:
-        if f < 1024.0:
-            return f"{f:.1f} {u}"
-        f /= 1024.0
-    return f"{f:.1f} PB"
+    n = int(n)
+    if n <= 0:
+        return "0.0 B"
+    # Each 1024x step is 10 bits; pick the unit from the bit length, divide once.
+    i = min(len(_SIZE_UNITS) - 1, (n.bit_length() - 1) // 10)
+    return f"{n / (1 << (i * 10)):.1f} {_SIZE_UNITS[i]}"
+
+
+# Keeps in-flight downloads referenced until their reply finishes.
+_ACTIVE_DOWNLOADS: set = set()
+
+
+# HTTP/2 opt-in attribute; named HTTP2AllowedAttribute before Qt 5.15, absent before 5.8.
+_HTTP2_ATTR = getattr(
+    QNetworkRequest, "Http2AllowedAttribute", getattr(QNetworkRequest, "HTTP2AllowedAttribute", None)
+)
+_DOWNLOAD_BUFFER_ATTR = getattr(QNetworkRequest, "MaximumDownloadBufferSizeAttribute", None)
+
+
+def _make_request(url: QUrl, http2: bool = True) -> QNetworkRequest:
+    """
+    Builds a network request carrying the plugin's User-Agent and raises Qt's download
+    buffer so it does not throttle the socket reader. http2 allows or forbids HTTP/2
+    (ALPN h2) explicitly; byte-range parts forbid it, since Qt would multiplex them over a
+    single connection and they exist precisely to open several TCP streams.
+    """
+    req = QNetworkRequest(url)
+    req.setRawHeader(b"User-Agent", b"CEM-QGIS-Downloader/0.1")
+    if _HTTP2_ATTR is not None:
+        req.setAttribute(_HTTP2_ATTR, http2)
+    if _DOWNLOAD_BUFFER_ATTR is not None:
+        req.setAttribute(_DOWNLOAD_BUFFER_ATTR, NETWORK_BUFFER_SIZE)
+    return req
+
+
+class _HttpDownload(QObject):
+    """
+    Streams a QNetworkReply to disk without blocking the GUI thread.
+    Invokes on_finished(error_message|None) once the reply completes.
+    """
+
+    def __init__(
+        self,
+        reply: QNetworkReply,
+        out_path: Path,
+        progress_cb: Optional[Callable[[int, int], None]],
+        on_finished: Optional[Callable[[Optional[str]], None]],
+    ) -> None:
+        super().__init__()
+        self.reply = reply
+        self.f = open(out_path, "wb", buffering=WRITE_BUFFER_SIZE)
+        self.received = 0
+        self._progress_cb = progress_cb
+        self._on_finished = on_finished
+
+        reply.readyRead.connect(self._on_ready_read)
+        reply.downloadProgress.connect(self._on_progress)
+        reply.finished.connect(self._on_reply_finished)
+
+    def _on_ready_read(self) -> None:
+        # QIODevice.read() returns Python bytes directly, avoiding the intermediate
+        # QByteArray that readAll() + bytes() would allocate and copy. PyQt allocates the
+        # full requested size per call, so never ask for more than is buffered.
+        while self.reply.bytesAvailable() > 0:
+            chunk = self.reply.read(min(READ_CHUNK_SIZE, self.reply.bytesAvailable()))
+            if not chunk:
+                break
+            self.f.write(chunk)
+            self.received += len(chunk)
+
+    def _on_progress(self, br: int, bt: int) -> None:
+        if self._progress_cb:
+            self._progress_cb(int(br), int(bt))
+
+    def _on_reply_finished(self) -> None:
+        # Drain whatever arrived together with the 'finished' notification.
+        self._on_ready_read()
+        self.f.close()
+
+        err = None
+        if self.reply.error():
+            err = f"Error de red: {self.reply.errorString()}"
+        self.reply.deleteLater()
+        _ACTIVE_DOWNLOADS.discard(self)
+
+        if self._on_finished:
+            self._on_finished(err)
+
+
+class _RangePart:
+    """
+    One 'Range: bytes=start-end' GET of a _RangedDownload. Writes through its own file
+    handle positioned at the range offset, so parts never share file state.
+    """
+
+    def __init__(self, owner: "_RangedDownload", start: int, end: int) -> None:
+        self.owner = owner
+        self.start = start
+        self.end = end
+        self.size = end - start + 1
+        self.received = 0
+        self.done = False
+
+        self.f = open(owner.out_path, "r+b", buffering=WRITE_BUFFER_SIZE)
+        self.f.seek(start)
+        req = _make_request(owner.url, http2=False)
+        req.setRawHeader(b"Range", f"bytes={start}-{end}".encode("ascii"))
+        self.reply = QgsNetworkAccessManager.instance().get(req)
+        self.reply.setReadBufferSize(NETWORK_BUFFER_SIZE)
+        self.reply.readyRead.connect(self._on_ready_read)
+        self.reply.finished.connect(self._on_reply_finished)
+
+    def _on_ready_read(self) -> None:
+        if self.owner.aborted:
+            return
+        if self.reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) != 206:
+            # The server ignored the Range header and is sending the whole file.
+            self.owner.fallback_to_single_get()
+            return
+        while self.reply.bytesAvailable() > 0 and self.received < self.size:
+            chunk = self.reply.read(
+                min(READ_CHUNK_SIZE, self.size - self.received, self.reply.bytesAvailable())
+            )
+            if not chunk:
+                break
+            self.f.write(chunk)
+            self.received += len(chunk)
+        self.owner.report_progress()
+
+    def _on_reply_finished(self) -> None:
+        if self.owner.aborted:
+            return
+        err = None
+        if self.reply.error():
+            err = f"Error de red: {self.reply.errorString()}"
+        else:
+            self._on_ready_read()
+            if self.owner.aborted:
+                return
+            if self.received != self.size:
+                err = f"Descarga incompleta del rango {self.start}-{self.end}."
+        self.close()
+        self.owner.part_finished(err)
+
+    def close(self) -> None:
+        if self.done:
+            return
+        self.done = True
+        self.f.close()
+        if self.reply.isRunning():
+            self.reply.abort()
+        self.reply.deleteLater()
+
+
+class _RangedDownload:
+    """
+    Downloads a file of known size as RANGE_PARTS concurrent byte-range GETs written into
+    a preallocated file. Several TCP streams fill high-latency links better than one.
+    """
+
+    def __init__(
+        self,
+        url: QUrl,
+        out_path: Path,
+        total: int,
+        progress_cb: Optional[Callable[[int, int], None]],
+        on_finished: Optional[Callable[[Optional[str]], None]],
+    ) -> None:
+        self.url = url
+        self.out_path = out_path
+        self.total = total
+        self._progress_cb = progress_cb
+        self._on_finished = on_finished
+        self.aborted = False
+
+        with open(out_path, "wb") as f:
+            f.truncate(total)
+        step = -(-total // RANGE_PARTS)
+        self.parts = []
+        try:
+            for a in range(0, total, step):
+                self.parts.append(_RangePart(self, a, min(a + step, total) - 1))
+        except Exception:
+            self._stop()  # abort the parts already in flight before the caller falls back
+            raise
+
+    def report_progress(self) -> None:
+        if self._progress_cb:
+            self._progress_cb(sum(p.received for p in self.parts), self.total)
+
+    def part_finished(self, err: Optional[str]) -> None:
+        if err:
+            self._stop()
+            self._finish(err)
+        elif all(p.done for p in self.parts):
+            self._finish(None)
+
+    def fallback_to_single_get(self) -> None:
+        self._stop()
+        _ACTIVE_DOWNLOADS.discard(self)
+        try:
+            _start_single_get(self.url, self.out_path, self._progress_cb, self._on_finished)
+        except Exception as e:
+            self._finish(f"No se pudo iniciar la descarga: {e}")
+
+    def _stop(self) -> None:
+        self.aborted = True
+        for p in self.parts:
+            p.close()
+
+    def _finish(self, err: Optional[str]) -> None:
+        _ACTIVE_DOWNLOADS.discard(self)
+        if self._on_finished:
+            self._on_finished(err)
+
+
+class _RangeProbe:
+    """
+    HEAD request deciding between a ranged and a single GET: ranges are used only when the
+    server reports 'Accept-Ranges: bytes' and a Content-Length of at least RANGE_MIN_SIZE.
+    """
+
+    def __init__(
+        self,
+        url: QUrl,
+        out_path: Path,
+        progress_cb: Optional[Callable[[int, int], None]],
+        on_finished: Optional[Callable[[Optional[str]], None]],
+    ) -> None:
+        self.url = url
+        self.out_path = out_path
+        self._progress_cb = progress_cb
+        self._on_finished = on_finished
+        self.reply = QgsNetworkAccessManager.instance().head(_make_request(url))
+        self.reply.finished.connect(self._on_reply_finished)
+
+    def _on_reply_finished(self) -> None:
+        reply = self.reply
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        total = reply.header(QNetworkRequest.ContentLengthHeader)
+        ranges = bytes(reply.rawHeader(b"Accept-Ranges")).decode("latin-1").strip().lower()
+        use_ranges = (
+            not reply.error()
+            and status == 200
+            and ranges == "bytes"
+            and total is not None
+            and int(total) >= RANGE_MIN_SIZE
+        )
+        reply.deleteLater()
+        _ACTIVE_DOWNLOADS.discard(self)
+
+        if use_ranges:
+            try:
+                _ACTIVE_DOWNLOADS.add(
+                    _RangedDownload(self.url, self.out_path, int(total), self._progress_cb, self._on_finished)
+                )
+                return
+            except OSError:
+                pass  # e.g. the file could not be preallocated; a single GET still may work
+        # This runs inside a Qt slot: failures must reach on_finished, not escape the slot.
+        try:
+            _start_single_get(self.url, self.out_path, self._progress_cb, self._on_finished)
+        except Exception as e:
+            if self._on_finished:
+                self._on_finished(f"No se pudo iniciar la descarga: {e}")
+
+
+def _start_single_get(
+    url: QUrl,
+    out_path: Path,
+    progress_cb: Optional[Callable[[int, int], None]],
+    on_finished: Optional[Callable[[Optional[str]], None]],
+) -> None:
+    reply = QgsNetworkAccessManager.instance().get(_make_request(url))
+    reply.setReadBufferSize(NETWORK_BUFFER_SIZE)
+    try:
+        _ACTIVE_DOWNLOADS.add(_HttpDownload(reply, out_path, progress_cb, on_finished))
+    except Exception:
+        reply.abort()
+        reply.deleteLater()
+        raise
 
 
 def http_get_to_file_progress(
     url: QUrl,
     out_path: Path,
     progress_cb: Optional[Callable[[int, int], None]] = None,
+    on_finished: Optional[Callable[[Optional[str]], None]] = None,
 ) -> None:
     """
-    Streams an HTTP GET request to disk using QgsNetworkAccessManager to honor QGIS
-    proxy/SSL settings. A progress callback receives (bytes_received, bytes_total|0).
+    Starts streaming an HTTP GET request to disk using QgsNetworkAccessManager to honor
+    QGIS proxy/SSL settings, and returns immediately. Large files on servers that accept
+    byte ranges are fetched as parallel Range requests; otherwise a single GET is used.
+    A progress callback receives (bytes_received, bytes_total|0); on_finished receives
+    None on success or an error message.
     """
-    nam = QgsNetworkAccessManager.instance()
-    req = QNetworkRequest(url)
-    req.setRawHeader(b"User-Agent", b"CEM-QGIS-Downloader/0.1")
-    reply = nam.get(req)
-
-    received = 0
-    f = open(out_path, "wb")
-
-    def on_ready_read():
-        nonlocal received
-        chunk = bytes(reply.readAll())
-        received += len(chunk)
-        f.write(chunk)
-
-    def on_progress(br, bt):
-        if progress_cb:
-            progress_cb(int(br), int(bt))
-
-    loop = QEventLoop()
-    reply.readyRead.connect(on_ready_read)
-    reply.downloadProgress.connect(on_progress)
-    reply.finished.connect(loop.quit)
-    loop.exec_()
-    f.close()
-
-    if reply.error():
-        err = reply.errorString()
-        reply.deleteLater()
-        raise RuntimeError(f"Error de red: {err}")
+    _ACTIVE_DOWNLOADS.add(_RangeProbe(url, out_path, progress_cb, on_finished))
+
 
-    reply.deleteLater()
+def raster_min_max(layer: QgsRasterLayer, band: int = 1) -> tuple:
+    """
+    Returns (min, max) for a raster band. Min/Max come from a pixel sample; if it collapses
+    to a constant range (e.g., 0–0), retries with a full-extent scan.
+    """
+    provider = layer.dataProvider()
+    flags = QgsRasterBandStats.Min | QgsRasterBandStats.Max
+    stats = provider.bandStatistics(band, flags, layer.extent(), STATS_SAMPLE_SIZE)
+    minv, maxv = stats.minimumValue, stats.maximumValue
+    if minv is None or maxv is None or minv == maxv:
+        stats = provider.bandStatistics(band, flags, layer.extent(), 0)
+        minv, maxv = stats.minimumValue, stats.maximumValue
+    return minv, maxv
 
 
-def add_raster_gray_with_stats(path: Path) -> bool:
+def build_gray_layer(path: Path, min_max: Optional[tuple] = None) -> Optional[QgsRasterLayer]:
     """
     Loads a raster file and enforces a Single-band Gray renderer with Stretch to Min/Max.
-    If initial statistics collapse to a constant range (e.g., 0–0), retries with sampling.
-    Returns True if the layer was added to the project successfully.
+    Statistics are computed with raster_min_max() unless precomputed 'min_max' is given.
+    Does not touch the project; returns None if the raster is invalid.
     """
     layer = QgsRasterLayer(str(path), path.stem, "gdal")
     if not layer.isValid():
-        return False
+        return None
 
     provider = layer.dataProvider()
     band = 1
-
-    # Full-extent statistics (no sampling). If degenerate, retry with sampling.
-    stats = provider.bandStatistics(band, QgsRasterBandStats.All, layer.extent(), 0)
-    minv, maxv = stats.minimumValue, stats.maximumValue
-    if minv == maxv:
-        stats = provider.bandStatistics(band, QgsRasterBandStats.All, layer.extent(), 10000)
-        minv, maxv = stats.minimumValue, stats.maximumValue
+    minv, maxv = min_max if min_max is not None else raster_min_max(layer, band)
 
     renderer = QgsSingleBandGrayRenderer(provider, band)
     ce = QgsContrastEnhancement(provider.dataType(band))
@@ -165,10 +598,36 @@ def add_raster_gray_with_stats(path: Path) -> bool:
 
     renderer.setContrastEnhancement(ce)
     layer.setRenderer(renderer)
+    return layer
+
+
+class _RasterStatsTask(QgsTask):
+    """
+    Background task computing a raster's Min/Max. The layer opened in run() is private to
+    the worker thread; the project layer is created later in finished(), on the main thread.
+    """
 
-    QgsProject.instance().addMapLayer(layer)
-    layer.triggerRepaint()
-    return True
+    def __init__(self, path: Path, on_done: Callable[["_RasterStatsTask", bool], None]) -> None:
+        super().__init__(f"CEM: estadísticas de {path.name}", QgsTask.CanCancel)
+        self.path = path
+        self.min_max: Optional[tuple] = None
+        self.layer: Optional[QgsRasterLayer] = None
+        self.error: Optional[str] = None
+        self._on_done = on_done
+
+    def run(self) -> bool:
+        try:
+            layer = QgsRasterLayer(str(self.path), self.path.stem, "gdal")
+            if not layer.isValid():
+                return False
+            self.min_max = raster_min_max(layer)
+            return True
+        except Exception as e:
+            self.error = str(e)
+            return False
+
+    def finished(self, result: bool) -> None:
+        self._on_done(self, result)
 
 
 def build_estado_url(entidad: str, cve_edo: str, res_m: int) -> QUrl:
@@ -181,14 +640,252 @@ def build_estado_url(entidad: str, cve_edo: str, res_m: int) -> QUrl:
     else:
         fname = f"CEM_V3_{BUILD_TAG}_R{res_m}_E{cve_edo}.zip"
 
-    from qgis.PyQt.QtCore import QUrl, QUrlQuery
-    u = QUrl(BASE_URL)
-    q = QUrlQuery()
-    q.addQueryItem("file", fname)
-    q.addQueryItem("res", str(res_m))
-    q.addQueryItem("entidad", entidad)
-    u.setQuery(q)
-    return u
+    query = urlencode({"file": fname, "res": res_m, "entidad": entidad}, quote_via=quote)
+    return QUrl(f"{BASE_URL}?{query}")
+
+
+# ------------------------------ Pipeline ------------------------------
+
+class _UnzipSignals(QObject):
+    """
+    Carries _UnzipJob results back to the GUI thread (connected with QueuedConnection).
+    """
+    done = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+
+class _UnzipJob(QRunnable):
+    """
+    Extracts the state ZIP (unless the marker says it already was) and scans the folder for
+    rasters on a QThreadPool worker, keeping the GUI thread free.
+    """
+
+    def __init__(self, zip_path: Path, out_dir: Path, marker: Path, signals: _UnzipSignals) -> None:
+        super().__init__()
+        self.zip_path = zip_path
+        self.out_dir = out_dir
+        self.marker = marker
+        self.signals = signals
+
+    def run(self) -> None:
+        try:
+            if not self.marker.exists():
+                unzip_all(self.zip_path, self.out_dir)
+                drop_page_cache(self.zip_path)
+                self.marker.touch()
+            rasters = guess_raster_files(self.out_dir)
+        except (zipfile.BadZipFile, zlib.error) as e:
+            # A corrupt cached ZIP would fail every retry the same way: drop it (and the
+            # marker) so the next attempt downloads and extracts a fresh copy.
+            self.marker.unlink(missing_ok=True)
+            self.zip_path.unlink(missing_ok=True)
+            self.signals.failed.emit(str(e))
+            return
+        except Exception as e:
+            # Disk full, permissions, scan errors: the ZIP itself is fine, only force a
+            # fresh extraction next time.
+            self.marker.unlink(missing_ok=True)
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.done.emit(rasters)
+
+
+class _EstadoPipeline:
+    """
+    Drives the state download as a chain of stages. The download runs asynchronously;
+    the remaining stages are triggered from its completion callback.
+    """
+
+    def __init__(
+        self,
+        entidad: str,
+        cve: str,
+        res_m: int,
+        log_widget: QTextEdit,
+        status_label: QLabel,
+        progressbar: QProgressBar,
+    ) -> None:
+        self.entidad = entidad
+        self.cve = cve
+        self.res_m = res_m
+        self.log_widget = log_widget
+        self.status_label = status_label
+        self.progressbar = progressbar
+
+        # Keyed by BUILD_TAG like the ZIP cache, so a new INEGI build is extracted again
+        # instead of reusing the previous build's rasters.
+        self.tmp_dir = plugin_temp_dir() / f"estado_{cve}_{res_m}m_{BUILD_TAG}"
+        # Completed downloads are renamed from the '.part' file only once they are a valid
+        # ZIP, so an existing ZIP in the cache is always a full one.
+        self.zip_path = zip_cache_path(cve, res_m)
+        self.part_path = self.zip_path.with_name(self.zip_path.name + ".part")
+        self.unzip_marker = self.tmp_dir / UNZIP_MARKER
+
+        # Latest (bytes_received, bytes_total) reported by the network layer; the UI
+        # timer repaints from it at a bounded rate instead of on every progress signal.
+        self._last = (0, 0)
+        self._shown = None
+        self._ui_timer = QTimer()
+        self._ui_timer.setInterval(UI_REFRESH_MS)
+        self._ui_timer.timeout.connect(self._flush_progress)
+
+    def start(self) -> None:
+        """
+        Stage 1–2: builds the URL and starts streaming the ZIP to the temp folder.
+        """
+        _ACTIVE_PIPELINES.add(self)
+        try:
+            url = build_estado_url(self.entidad, self.cve, self.res_m)
+            log_append(self.log_widget, f"URL: {url.toString()}")
+
+            self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+            if self.zip_path.exists():
+                if zipfile.is_zipfile(self.zip_path):
+                    log_append(self.log_widget, f"Usando ZIP en caché: {self.zip_path}")
+                    self._on_downloaded(None)
+                    return
+                self.zip_path.unlink()
+                self.unzip_marker.unlink(missing_ok=True)
+
+            # Initial UI state
+            self.status_label.setText("Conectando a INEGI…")
+            self.progressbar.setRange(0, 0)
+            self.progressbar.setValue(0)
+
+            # Download with progress
+            log_append(self.log_widget, f"Descargando ZIP a: {self.zip_path}")
+            http_get_to_file_progress(
+                url, self.part_path, progress_cb=self._on_progress, on_finished=self._on_downloaded
+            )
+            self._ui_timer.start()
+        except Exception as e:
+            self._fail(e)
+
+    def _on_progress(self, br: int, bt: int) -> None:
+        self._last = (br, bt)
+
+    def _flush_progress(self) -> None:
+        if self._last == self._shown:
+            return
+        self._shown = br, bt = self._last
+        if bt <= 0:
+            self.progressbar.setRange(0, 0)
+            self.status_label.setText(f"Descargando… {human_size(br)}")
+        else:
+            self.progressbar.setRange(0, 100)
+            pct = int((br * 100.0) / max(1, bt))
+            self.progressbar.setValue(pct)
+            self.status_label.setText(f"Descargando… {pct}%  ({human_size(br)}/{human_size(bt)})")
+
+    def _on_downloaded(self, err: Optional[str]) -> None:
+        """
+        Stage 3: hands unzip + raster discovery to a worker thread.
+        """
+        self._ui_timer.stop()
+        self._flush_progress()
+        try:
+            if err:
+                self.part_path.unlink(missing_ok=True)
+                raise RuntimeError(err)
+            if self.part_path.exists():
+                if not zipfile.is_zipfile(self.part_path):
+                    self.part_path.unlink(missing_ok=True)
+                    raise RuntimeError("La respuesta de INEGI no es un ZIP válido (¿página de error?).")
+                self.unzip_marker.unlink(missing_ok=True)
+                self.part_path.replace(self.zip_path)
+
+            # Post-download
+            self.progressbar.setRange(0, 0)
+            self.status_label.setText("Descarga completa. Descomprimiendo…")
+
+            # Unzip (unless a previous run already extracted this package) and locate rasters
+            if self.unzip_marker.exists():
+                log_append(self.log_widget, f"ZIP ya descomprimido en: {self.tmp_dir}")
+            else:
+                log_append(self.log_widget, "Descomprimiendo…")
+
+            self._unzip_signals = _UnzipSignals()
+            self._unzip_signals.done.connect(self._on_unzipped, Qt.QueuedConnection)
+            self._unzip_signals.failed.connect(self._fail, Qt.QueuedConnection)
+            QThreadPool.globalInstance().start(
+                _UnzipJob(self.zip_path, self.tmp_dir, self.unzip_marker, self._unzip_signals)
+            )
+
+        except Exception as e:
+            self._fail(e)
+
+    def _on_unzipped(self, rasters: list) -> None:
+        """
+        Stage 4: queues one statistics task per discovered raster.
+        """
+        try:
+            if not rasters:
+                self.progressbar.setRange(0, 100)
+                self.progressbar.setValue(0)
+                self.status_label.setText("No se encontraron rásters en el ZIP.")
+                log_append(self.log_widget, "No se encontraron rásters dentro del ZIP.")
+                _ACTIVE_PIPELINES.discard(self)
+                return
+
+            # Add rasters to project with single-band gray styling
+            self.status_label.setText("Agregando rásters al proyecto…")
+            self.progressbar.setRange(0, len(rasters))
+            self.progressbar.setValue(0)
+
+            # Statistics run concurrently on the QGIS task manager; layers are added as
+            # each task finishes (on the main thread).
+            self._rasters_done = 0
+            self._tasks = [_RasterStatsTask(rpath, self._on_stats_done) for rpath in rasters]
+            for task in self._tasks:
+                QgsApplication.taskManager().addTask(task)
+
+        except Exception as e:
+            self._fail(e)
+
+    def _on_stats_done(self, task: _RasterStatsTask, ok: bool) -> None:
+        """
+        Stage 4 (per raster): builds the styled layer; the project is updated once all
+        tasks are done, with a single addMapLayers() call.
+        """
+        try:
+            if ok:
+                task.layer = build_gray_layer(task.path, task.min_max)
+            if task.layer is None:
+                if task.error:
+                    log_append(self.log_widget, f"ERROR ({task.path}): {task.error}")
+                else:
+                    log_append(self.log_widget, f"Archivo inválido (no cargado): {task.path}")
+        except Exception as e:
+            log_append(self.log_widget, f"ERROR ({task.path}): {e}")
+
+        self._rasters_done += 1
+        self.progressbar.setValue(self._rasters_done)
+        if self._rasters_done < len(self._tasks):
+            return
+
+        # Register in the original discovery order, emitting layersAdded only once.
+        layers = [t.layer for t in self._tasks if t.layer is not None]
+        if layers:
+            QgsProject.instance().addMapLayers(layers)
+        for layer in layers:
+            log_append(self.log_widget, f"Agregado al proyecto (Gris monobanda): {layer.source()}")
+
+        self.status_label.setText("Listo. Recuerda: los archivos están en carpeta TEMP.")
+        log_append(self.log_widget, "Listo. Recuerda: los archivos están en carpeta TEMP.")
+        _ACTIVE_PIPELINES.discard(self)
+
+    def _fail(self, e) -> None:
+        self._ui_timer.stop()
+        self.progressbar.setRange(0, 100)
+        self.progressbar.setValue(0)
+        self.status_label.setText("Error.")
+        log_append(self.log_widget, f"ERROR: {e}")
+        _ACTIVE_PIPELINES.discard(self)
+
+
+# Keeps running pipelines (and their background tasks) referenced until they complete.
+_ACTIVE_PIPELINES: set = set()
 
 
 # ------------------------------ Public API ------------------------------
@@ -203,80 +900,12 @@ def download_estado_with_progress(
 ) -> None:
     """
     State-based CEM downloader with live progress feedback.
+    Returns as soon as the download has started; later stages run from Qt callbacks.
     Pipeline:
       1) Build DownloadFile.do URL for (entidad, cve, res_m).
-      2) Stream ZIP to a plugin temp folder with byte-level progress reporting.
-      3) Unzip and discover raster files.
+      2) Stream ZIP to a plugin temp folder with byte-level progress reporting
+         (skipped when the same state/resolution ZIP is already cached).
+      3) Unzip and discover raster files (on a worker thread).
       4) Add each raster to the project with Single-band Gray (Min/Max stretch).
     """
-    try:
-        url = build_estado_url(entidad, cve, res_m)
-        log_append(log_widget, f"URL: {url.toString()}")
-
-        tmp_dir = plugin_temp_dir() / f"estado_{cve}_{res_m}m"
-        tmp_dir.mkdir(parents=True, exist_ok=True)
-        zip_path = tmp_dir / "cem_estado.zip"
-
-        # Initial UI state
-        status_label.setText("Conectando a INEGI…")
-        progressbar.setRange(0, 0)
-        progressbar.setValue(0)
-        QApplication.processEvents()
-
-        # Download with progress
-        log_append(log_widget, f"Descargando ZIP a: {zip_path}")
-
-        def _cb(br: int, bt: int) -> None:
-            if bt <= 0:
-                progressbar.setRange(0, 0)
-                status_label.setText(f"Descargando… {human_size(br)}")
-            else:
-                progressbar.setRange(0, 100)
-                pct = int((br * 100.0) / max(1, bt))
-                progressbar.setValue(pct)
-                status_label.setText(f"Descargando… {pct}%  ({human_size(br)}/{human_size(bt)})")
-            QApplication.processEvents()
-
-        http_get_to_file_progress(url, zip_path, progress_cb=_cb)
-
-        # Post-download
-        progressbar.setRange(0, 100)
-        progressbar.setValue(100)
-        status_label.setText("Descarga completa. Descomprimiendo…")
-        QApplication.processEvents()
-
-        # Unzip and locate rasters
-        log_append(log_widget, "Descomprimiendo…")
-        unzip_all(zip_path, tmp_dir)
-
-        status_label.setText("Buscando rásters en el ZIP…")
-        QApplication.processEvents()
-        rasters = guess_raster_files(tmp_dir)
-        if not rasters:
-            status_label.setText("No se encontraron rásters en el ZIP.")
-            log_append(log_widget, "No se encontraron rásters dentro del ZIP.")
-            return
-
-        # Add rasters to project with single-band gray styling
-        status_label.setText("Agregando rásters al proyecto…")
-        progressbar.setRange(0, len(rasters))
-        progressbar.setValue(0)
-        QApplication.processEvents()
-
-        for i, rpath in enumerate(rasters, start=1):
-            ok = add_raster_gray_with_stats(rpath)
-            if ok:
-                log_append(log_widget, f"Agregado al proyecto (Gris monobanda): {rpath}")
-            else:
-                log_append(log_widget, f"Archivo inválido (no cargado): {rpath}")
-            progressbar.setValue(i)
-            QApplication.processEvents()
-
-        status_label.setText("Listo. Recuerda: los archivos están en carpeta TEMP.")
-        log_append(log_widget, "Listo. Recuerda: los archivos están en carpeta TEMP.")
-
-    except Exception as e:
-        progressbar.setRange(0, 100)
-        progressbar.setValue(0)
-        status_label.setText("Error.")
-        log_append(log_widget, f"ERROR: {e}")
+    _EstadoPipeline(entidad, cve, res_m, log_widget, status_label, progressbar).start()
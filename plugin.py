@@ -15,6 +15,7 @@ INEGI CEM Downloader (QGIS Plugin)
          clipped and symbolized as Single-band Gray with Min/Max stretch.
 """
 
+import functools
 import json
 import os
 from pathlib import Path
@@ -26,9 +27,6 @@ from qgis.PyQt.QtWidgets import (
 )
 from qgis.core import QgsProject, QgsVectorLayer, QgsWkbTypes
 
-from .estado_descarga import download_estado_with_progress
-from .poligono_wcs import download_poligono_wcs_split_per_polygon
-
 PLUGIN_DIR = os.path.dirname(__file__)
 ICON_PATH = os.path.join(PLUGIN_DIR, "icon.png")
 RES_LIST = [15, 30, 60, 90, 120]
@@ -41,6 +39,26 @@ def estados_json_path() -> Path:
     return Path(__file__).parent / "data" / "estados.json"
 
 
+@functools.lru_cache(maxsize=1)
+def _estados_cached() -> tuple:
+    """
+    Loads 'estados.json' once and returns its items excluding 'Nacional'.
+    Parses with orjson when it is installed, falling back to the stdlib json module.
+    """
+    p = estados_json_path()
+    try:
+        import orjson
+        all_items = orjson.loads(p.read_bytes())
+    except ImportError:
+        all_items = json.loads(p.read_text(encoding="utf-8"))
+    out = []
+    for it in all_items:
+        name = (it.get("entidad") or "").strip()
+        if name and name.lower() != "nacional":
+            out.append(it)
+    return tuple(out)
+
+
 def ensure_polygon_layer(layer: QgsVectorLayer) -> bool:
     """
     Validates a QgsVectorLayer is a polygon layer (including multipart).
@@ -138,23 +156,18 @@ class CEMDialog(QDialog):
 
     def _load_estados(self):
         """
-        Loads 'estados.json' and returns items excluding 'Nacional'.
+        Returns the bundled states excluding 'Nacional' (parsed once per session).
         """
-        p = estados_json_path()
-        with open(p, "r", encoding="utf-8") as f:
-            all_items = json.load(f)
-        out = []
-        for it in all_items:
-            name = (it.get("entidad") or "").strip()
-            if name and name.lower() != "nacional":
-                out.append(it)
-        return out
+        return list(_estados_cached())
 
     # ---------------- Tab 1: By State ----------------
     def on_download_estado(self):
         """
         Triggers ZIP download pipeline for the selected state and resolution.
         """
+        # Imported on first use so the network/ZIP code is not loaded at QGIS startup.
+        from .estado_descarga import download_estado_with_progress
+
         item = self.cboEstado.currentData()
         res_m = self.cboResEstado.currentData()
         if not item:
@@ -188,6 +201,9 @@ class CEMDialog(QDialog):
         Triggers the per-polygon WCS download + clip + load pipeline for the selected layer.
         Produces one GeoTIFF per polygon (singleparts extracted from multiparts).
         """
+        # Imported on first use: it pulls in the processing framework.
+        from .poligono_wcs import download_poligono_wcs_split_per_polygon
+
         layer = self.cboLayer.currentData()
         if not layer or not isinstance(layer, QgsVectorLayer) or not ensure_polygon_layer(layer):
             log_append(self.log2, "Selecciona una capa de polígonos válida.")
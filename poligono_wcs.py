@@ -8,24 +8,88 @@
 # version 3 or later. THIS PROGRAM IS PROVIDED "AS IS", WITHOUT
 # WARRANTY; see the LICENSE file for more details.
 
+import functools
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
+from urllib.parse import quote
 
-from qgis.PyQt.QtCore import QUrl, QStandardPaths, QEventLoop, QVariant
-from qgis.PyQt.QtNetwork import QNetworkRequest
+from qgis.PyQt.QtCore import QUrl, QStandardPaths, QFile, QIODevice
+from qgis.PyQt.QtGui import QTextCursor
 from qgis.PyQt.QtWidgets import QApplication, QTextEdit, QLabel, QProgressBar
 from qgis.core import (
-    QgsProject, QgsVectorLayer, QgsVectorFileWriter, QgsCoordinateTransformContext,
-    QgsNetworkAccessManager, QgsCoordinateReferenceSystem, QgsCoordinateTransform,
-    QgsRasterLayer, QgsSingleBandGrayRenderer, QgsContrastEnhancement, QgsRasterBandStats,
-    QgsVectorDataProvider, QgsField, QgsFeature, QgsGeometry
+    QgsProject, QgsVectorLayer, QgsFeatureRequest,
+    QgsBlockingNetworkRequest, QgsCoordinateReferenceSystem, QgsCoordinateTransform,
+    QgsGeometry, QgsSettings, QgsWkbTypes
 )
 import processing
+from osgeo import gdal
+
+from .estado_descarga import _make_request, build_gray_layer
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
 
 # ------------------ Configuration ------------------
 WCS_BASE = "https://gaia.inegi.org.mx/geoserver/wcs"
 WCS_COVERAGE_ID = "cem30_workespace:cem3_r15"
 NODATA_VALUE = -9999
 VALID_RES = [15, 30, 60, 90, 120]
+# Concurrent polygon downloads; kept low so INEGI's server does not throttle us.
+WCS_MAX_WORKERS = 4
+# Jobs queued per worker by the bounded producer (keeps the pool busy, memory flat).
+PENDING_PER_WORKER = 2
+# GUI refresh throttling: seconds between event pumps, log lines between scrolls.
+UI_PUMP_INTERVAL = 0.1
+LOG_SCROLL_EVERY = 20
+# Streaming download chunk / write buffer (1 MiB), progress cadence and socket timeout (s).
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+PROGRESS_EVERY_CHUNKS = 8
+HTTP_TIMEOUT = 120
+# Clipped GeoTIFF layout: internal tiles (px) for fast rendering reads.
+CLIP_BLOCK_SIZE = 256
+# "auto" strategy: use one union-bbox GetCoverage while the union area stays within this
+# factor of the summed per-polygon bbox areas and below UNION_MAX_PIXELS pixels.
+UNION_MAX_AREA_RATIO = 4.0
+UNION_MAX_PIXELS = 50_000_000
+# WCS response cache (plugin_temp_dir()/wcs_cache): once a run pushes it past this size it
+# is trimmed, oldest first, down to WCS_CACHE_TRIM_RATIO of it (so sweeps stay rare);
+# '.part' files untouched for WCS_PART_STALE_S come from crashed runs.
+WCS_CACHE_MAX_MB = 2048
+WCS_CACHE_TRIM_RATIO = 0.75
+WCS_PART_STALE_S = 3600
+# Meter resolution -> angular pixel size in degrees (INEGI's arcsecond scheme).
+_STEP_TABLE = {15: 0.5 / 3600, 30: 1.0 / 3600, 60: 2.0 / 3600, 90: 3.0 / 3600, 120: 4.0 / 3600}
+
+_CRS_4326 = QgsCoordinateReferenceSystem("EPSG:4326")
+
+# Threads per in-process warp (warping and DEFLATE): WCS_MAX_WORKERS clips run at once, so
+# each gets its share of the cores instead of all of them. Passed as per-call options;
+# process-wide GDAL config is left to QGIS.
+_WARP_THREADS = max(1, (os.cpu_count() or 1) // WCS_MAX_WORKERS)
+
+
+def _make_session():
+    """
+    Builds the shared keep-alive session. The pool holds enough connections for every
+    worker, so polygons reuse TLS connections instead of handshaking per request.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = "CEM-QGIS-Downloader/0.1"
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared requests session (connection reuse across polygons); None if requests is missing.
+_SESSION = _make_session() if requests is not None else None
 
 
 # ------------------ Utilities ------------------
@@ -42,23 +106,41 @@ def plugin_temp_dir() -> Path:
 
 def log_append(widget: QTextEdit, msg: str) -> None:
     """
-    Appends a message to a QTextEdit and ensures the view follows the cursor.
+    Appends a line to a QTextEdit through a detached cursor, which neither moves the view
+    nor goes through append(). The view only scrolls to the end every LOG_SCROLL_EVERY
+    messages written to that widget; call log_flush() after the last message of a run.
     """
-    widget.append(msg)
+    c = QTextCursor(widget.document())
+    c.movePosition(QTextCursor.End)
+    c.insertText(msg + "\n")
+    n = (widget.property("cem_log_count") or 0) + 1
+    widget.setProperty("cem_log_count", n)
+    if n % LOG_SCROLL_EVERY == 0:
+        log_flush(widget)
+
+
+def log_flush(widget: QTextEdit) -> None:
+    """
+    Scrolls the log to its last line.
+    """
+    widget.moveCursor(QTextCursor.End)
     widget.ensureCursorVisible()
 
 
-def human_size(n: float) -> str:
+class _UiPump:
     """
-    Formats a byte count into a human-readable string (IEC-like, simple).
+    Calls QApplication.processEvents() at most once per UI_PUMP_INTERVAL seconds, so tight
+    main-thread loops keep the UI alive without redrawing on every iteration.
     """
-    units = ["B", "KB", "MB", "GB", "TB"]
-    f = float(n)
-    for u in units:
-        if f < 1024.0:
-            return f"{f:.1f} {u}"
-        f /= 1024.0
-    return f"{f:.1f} PB"
+
+    def __init__(self) -> None:
+        self._last = 0.0
+
+    def __call__(self) -> None:
+        now = time.monotonic()
+        if now - self._last >= UI_PUMP_INTERVAL:
+            self._last = now
+            QApplication.processEvents()
 
 
 def meters_to_deg_step(res_m: int) -> float:
@@ -66,156 +148,430 @@ def meters_to_deg_step(res_m: int) -> float:
     Maps a meter resolution to an angular pixel size in degrees, using INEGI's arcsecond scheme.
     15→0.5", 30→1", 60→2", 90→3", 120→4".
     """
-    table = {15: 0.5, 30: 1.0, 60: 2.0, 90: 3.0, 120: 4.0}
-    if res_m not in table:
-        raise ValueError("Resolución inválida (usa 15,30,60,90,120).")
-    return table[res_m] / 3600.0
+    try:
+        return _STEP_TABLE[res_m]
+    except KeyError:
+        raise ValueError("Resolución inválida (usa 15,30,60,90,120).") from None
 
 
-def build_wcs_getcoverage_url(bbox4326, res_m: int) -> QUrl:
+@functools.lru_cache(maxsize=None)
+def _wcs_url_prefix(step_deg: float) -> str:
     """
-    Builds a WCS 1.0.0 GetCoverage URL for the given bbox (EPSG:4326) and resolution.
-    The server resamples based on resx/resy, format GeoTIFF.
+    Returns the already-encoded GetCoverage URL for one pixel size, minus the bbox, so each
+    polygon only formats and appends its four coordinates.
+    """
+    return (
+        f"{WCS_BASE}?request=GetCoverage&service=WCS&version=1.0.0"
+        f"&coverage={quote(WCS_COVERAGE_ID, safe=':')}&crs=EPSG:4326&format=GeoTIFF"
+        f"&resx={step_deg:.7f}&resy={step_deg:.7f}"
+    )
+
+
+def build_wcs_getcoverage_url(bbox4326, step_deg: float) -> QUrl:
+    """
+    Builds a WCS 1.0.0 GetCoverage URL for the given bbox (EPSG:4326) and pixel size in
+    degrees (see meters_to_deg_step). The server resamples based on resx/resy, format GeoTIFF.
     """
     minx, miny, maxx, maxy = bbox4326
-    step = meters_to_deg_step(res_m)
-    from qgis.PyQt.QtCore import QUrlQuery
-    u = QUrl(WCS_BASE)
-    q = QUrlQuery()
-    q.addQueryItem("request", "GetCoverage")
-    q.addQueryItem("service", "WCS")
-    q.addQueryItem("version", "1.0.0")
-    q.addQueryItem("coverage", WCS_COVERAGE_ID)
-    q.addQueryItem("crs", "EPSG:4326")
-    q.addQueryItem("bbox", f"{minx:.8f},{miny:.8f},{maxx:.8f},{maxy:.8f}")
-    q.addQueryItem("resx", f"{step:.7f}")
-    q.addQueryItem("resy", f"{step:.7f}")
-    q.addQueryItem("format", "GeoTIFF")
-    u.setQuery(q)
-    return u
+    url = f"{_wcs_url_prefix(step_deg)}&bbox={minx:.8f},{miny:.8f},{maxx:.8f},{maxy:.8f}"
+    return QUrl.fromEncoded(bytes(url, "ascii"))
 
 
 def http_get_to_file_progress(url: QUrl, out_path: Path, progress_cb=None) -> None:
     """
-    Streams a HTTP GET to disk using QgsNetworkAccessManager, honoring QGIS proxy/SSL.
+    Fetches a HTTP GET to disk with QgsBlockingNetworkRequest, honoring QGIS proxy/SSL.
+    It is QGIS's supported blocking API for worker threads (no nested event loop on a
+    foreign thread); the response is held in memory until written.
     Optionally reports progress via a callback: progress_cb(bytes_received, bytes_total|0).
     """
-    nam = QgsNetworkAccessManager.instance()
-    req = QNetworkRequest(url)
-    req.setRawHeader(b"User-Agent", b"CEM-QGIS-Downloader/0.1")
-    reply = nam.get(req)
-
-    received = 0
-    f = open(out_path, "wb")
-
-    def on_ready_read():
-        nonlocal received
-        chunk = bytes(reply.readAll())
-        received += len(chunk)
-        f.write(chunk)
-
-    def on_progress(br, bt):
-        if progress_cb:
-            progress_cb(int(br), int(bt))
-
-    loop = QEventLoop()
-    reply.readyRead.connect(on_ready_read)
-    reply.downloadProgress.connect(on_progress)
-    reply.finished.connect(loop.quit)
-    loop.exec_()
+    req = _make_request(url)
+    blocking = QgsBlockingNetworkRequest()
+    if progress_cb:
+        blocking.downloadProgress.connect(lambda br, bt: progress_cb(int(br), int(bt)))
+    if blocking.get(req, True) != QgsBlockingNetworkRequest.NoError:
+        raise RuntimeError(f"Error de red: {blocking.errorMessage()}")
+
+    # QFile.write() takes the reply's QByteArray as is, so the payload never becomes a
+    # Python bytes object.
+    f = QFile(str(out_path))
+    if not f.open(QIODevice.WriteOnly):
+        raise RuntimeError(f"No se pudo escribir {out_path}: {f.errorString()}")
+    f.write(blocking.reply().content())
     f.close()
 
-    if reply.error():
-        err = reply.errorString()
-        reply.deleteLater()
-        raise RuntimeError(f"Error de red: {err}")
 
-    reply.deleteLater()
+def _qgis_proxy_enabled() -> bool:
+    """
+    True if the user configured a proxy in QGIS, which only QgsNetworkAccessManager honors.
+    """
+    return QgsSettings().value("proxy/proxyEnabled", False, type=bool)
+
+
+def http_get_to_file_requests(url: QUrl, out_path: Path, progress_cb=None) -> None:
+    """
+    Streams a HTTP GET to disk with the shared requests session, in 1 MiB chunks.
+    Plain blocking I/O without Qt signals, so it is cheap to call from worker threads.
+    Optionally reports progress every few chunks: progress_cb(bytes_received, bytes_total|0).
+    """
+    try:
+        with _SESSION.get(bytes(url.toEncoded()).decode("ascii"), stream=True, timeout=HTTP_TIMEOUT) as resp:
+            resp.raise_for_status()
+            total = int(resp.headers.get("Content-Length") or 0)
+            received = 0
+            with open(out_path, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                for n, chunk in enumerate(resp.iter_content(DOWNLOAD_CHUNK_SIZE), start=1):
+                    f.write(chunk)
+                    received += len(chunk)
+                    if progress_cb and n % PROGRESS_EVERY_CHUNKS == 0:
+                        progress_cb(received, total)
+            if progress_cb:
+                progress_cb(received, total)
+    except requests.RequestException as e:
+        raise RuntimeError(f"Error de red: {e}") from e
+
+
+def _download(url: QUrl, out_path: Path) -> None:
+    """
+    Downloads with requests when available and QGIS has no proxy configured; otherwise
+    falls back to the proxy/SSL-aware QgsBlockingNetworkRequest path. Safe on worker threads.
+    """
+    if _SESSION is not None and not _qgis_proxy_enabled():
+        http_get_to_file_requests(url, out_path)
+    else:
+        http_get_to_file_progress(url, out_path)
 
 
-def add_raster_gray_with_stats(path: Path) -> bool:
+def wcs_cache_path(bbox4326, res_m: int) -> Path:
     """
-    Loads a raster and enforces a single-band gray renderer with Stretch to Min/Max.
-    Computes band statistics; retries with a sample count if min == max (e.g., 0–0).
+    Returns the cache location of the GetCoverage response for a (padded) EPSG:4326 bbox at
+    res_m; the pair fully determines the response, so the name is a hash of both.
     """
-    layer = QgsRasterLayer(str(path), path.stem, "gdal")
-    if not layer.isValid():
+    minx, miny, maxx, maxy = bbox4326
+    key = hashlib.sha1(f"{minx:.8f},{miny:.8f},{maxx:.8f},{maxy:.8f},{res_m}".encode()).hexdigest()
+    d = plugin_temp_dir() / "wcs_cache"
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"{key}.tif"
+
+
+def _is_readable_raster(path: Path) -> bool:
+    """
+    True when GDAL can open path as a raster (e.g., False for a WCS ServiceException XML
+    that GeoServer returned with HTTP 200).
+    """
+    # Rejections are expected here: keep them out of the GDAL error log.
+    gdal.PushErrorHandler("CPLQuietErrorHandler")
+    try:
+        ds = gdal.Open(str(path))
+    except RuntimeError:  # only raised if something in the process enabled gdal.UseExceptions()
         return False
+    finally:
+        gdal.PopErrorHandler()
+    ok = ds is not None
+    ds = None
+    return ok
+
+
+def _download_cached(url: QUrl, cache_path: Path) -> int:
+    """
+    Downloads url into cache_path unless it is already cached. Responses land in a
+    per-thread '.part' file that is renamed only once GDAL can open it, so a cached file is
+    always a complete raster; unreadable hits are dropped and downloaded again.
+    Hits have their mtime refreshed, which is the recency used by _sweep_wcs_cache.
+    Returns the bytes added to the cache (0 on a hit).
+    """
+    if cache_path.exists():
+        if _is_readable_raster(cache_path):
+            os.utime(cache_path)
+            return 0
+        cache_path.unlink(missing_ok=True)
+    part = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}.part")
+    try:
+        _download(url, part)
+        if not _is_readable_raster(part):
+            with open(part, "rb") as f:
+                head = f.read(300).decode("utf-8", "replace").strip()
+            raise RuntimeError(f"La respuesta WCS no es un GeoTIFF válido: {head}")
+        size = part.stat().st_size
+        try:
+            part.replace(cache_path)
+        except OSError:
+            # Another worker cached the same bbox first and its file is open (Windows).
+            if not cache_path.exists():
+                raise
+            return 0
+        return size
+    finally:
+        part.unlink(missing_ok=True)
+
+
+def _sweep_wcs_cache(max_bytes: int, keep: Path = None) -> int:
+    """
+    Deletes the least recently used cached responses until the cache fits in max_bytes,
+    never touching keep (a raster still being clipped from), and removes stale '.part'
+    files left behind by interrupted downloads. Returns the bytes left in the cache.
+    """
+    entries = []
+    stale_before = time.time() - WCS_PART_STALE_S
+    keep = str(keep) if keep is not None else None
+    with os.scandir(plugin_temp_dir() / "wcs_cache") as it:
+        for e in it:
+            if e.path == keep:
+                continue
+            st = e.stat()
+            if e.name.endswith(".tif"):
+                entries.append((st.st_mtime, st.st_size, e.path))
+            elif e.name.endswith(".part") and st.st_mtime < stale_before:
+                try:
+                    os.remove(e.path)
+                except OSError:
+                    pass
+    used = sum(e[1] for e in entries)
+    for _, size, path in sorted(entries):
+        if used <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            used -= size
+        except OSError:
+            pass  # still open elsewhere (e.g., another run on Windows); retried next sweep
+    return used
+
 
-    provider = layer.dataProvider()
-    band = 1
-    stats = provider.bandStatistics(band, QgsRasterBandStats.All, layer.extent(), 0)
-    minv, maxv = stats.minimumValue, stats.maximumValue
-
-    if minv == maxv:
-        stats = provider.bandStatistics(band, QgsRasterBandStats.All, layer.extent(), 10000)
-        minv, maxv = stats.minimumValue, stats.maximumValue
-
-    renderer = QgsSingleBandGrayRenderer(provider, band)
-    ce = QgsContrastEnhancement(provider.dataType(band))
-    ce.setContrastEnhancementAlgorithm(QgsContrastEnhancement.StretchToMinimumMaximum, True)
-    if (minv is not None) and (maxv is not None) and (minv < maxv):
-        ce.setMinimumValue(minv)
-        ce.setMaximumValue(maxv)
-    renderer.setContrastEnhancement(ce)
-    layer.setRenderer(renderer)
-
-    QgsProject.instance().addMapLayer(layer)
+def add_raster_gray_with_stats(path: Path, project: QgsProject = None) -> bool:
+    """
+    Loads a raster styled by build_gray_layer() (single-band gray, sampled Min/Max stretch)
+    and adds it to the project.
+    project defaults to QgsProject.instance(); callers adding many layers pass it once.
+    """
+    layer = build_gray_layer(path)
+    if layer is None:
+        return False
+    (project or QgsProject.instance()).addMapLayer(layer)
     layer.triggerRepaint()
     return True
 
 
+def _count_features(layer: QgsVectorLayer) -> int:
+    """
+    Returns the layer's feature count, counting by iteration (no geometry, no attributes)
+    when the provider reports it as unknown (-1, e.g. WFS or PostGIS estimated metadata).
+    """
+    n = layer.featureCount()
+    if n >= 0:
+        return n
+    req = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setNoAttributes()
+    return sum(1 for _ in layer.getFeatures(req))
+
+
 def _explode_to_singleparts(layer: QgsVectorLayer) -> QgsVectorLayer:
     """
     Ensures a one-polygon-per-feature layer by converting multipart features to singleparts
-    via the native QGIS processing algorithm. Returns an in-memory layer.
+    via the native QGIS processing algorithm. Returns an in-memory layer, or the input
+    itself when its geometry type is already single-part (no copy needed).
     """
+    if not QgsWkbTypes.isMultiType(layer.wkbType()):
+        return layer
     res = processing.run("native:multiparttosingleparts", {"INPUT": layer, "OUTPUT": "memory:"})
     return res["OUTPUT"]
 
 
-def _write_single_polygon_geojson_4326(geom: QgsGeometry, src_crs, out_path: Path) -> None:
+def _transform_to_4326(src_crs, project: QgsProject) -> QgsCoordinateTransform:
+    """
+    Returns the transform from src_crs to EPSG:4326 under the project's current transform
+    context. Built once per download run and shared by every feature, so the PROJ pipeline
+    is looked up once per run instead of once per feature, and never outlives a change of
+    datum transformation settings or project.
+    """
+    return QgsCoordinateTransform(src_crs, _CRS_4326, project.transformContext())
+
+
+def _write_polygon_geojson_4326(geom_4326: QgsGeometry, out_path: Path) -> None:
     """
-    Builds a one-feature in-memory layer with the given polygon geometry, reprojects it to
-    EPSG:4326, and writes it to GeoJSON. Handles writer return arities across QGIS versions.
+    Writes the polygon (already in EPSG:4326) as a one-feature GeoJSON FeatureCollection,
+    formatted straight from QgsGeometry.asJson() with no memory layer or vector writer.
     """
-    crs_dst = QgsCoordinateReferenceSystem("EPSG:4326")
-    ct = QgsCoordinateTransform(src_crs, crs_dst, QgsProject.instance().transformContext())
-    geom_4326 = QgsGeometry(geom)
-    geom_4326.transform(ct)
+    out_path.write_text(
+        '{"type":"FeatureCollection",'
+        '"crs":{"type":"name","properties":{"name":"EPSG:4326"}},'
+        '"features":[{"type":"Feature","properties":{"id":1},"geometry":'
+        + geom_4326.asJson()
+        + "}]}",
+        encoding="utf-8",
+    )
 
-    mem = QgsVectorLayer("Polygon?crs=EPSG:4326", "mask", "memory")
-    pr: QgsVectorDataProvider = mem.dataProvider()
-    pr.addAttributes([QgsField("id", QVariant.Int)])
-    mem.updateFields()
 
-    feat = QgsFeature(mem.fields())
-    feat.setGeometry(geom_4326)
-    feat.setAttribute("id", 1)
-    pr.addFeatures([feat])
-    mem.updateExtents()
+def _polygon_parts(geom: QgsGeometry):
+    """
+    Returns the single polygons of geom. _explode_to_singleparts trusts the declared layer
+    type, but some providers (shapefile, GeoJSON) declare Polygon and still return
+    MultiPolygon features, so parts are split here too.
+    """
+    if geom.isMultipart():
+        return geom.asGeometryCollection()
+    return [geom]
 
-    opts = QgsVectorFileWriter.SaveVectorOptions()
-    opts.driverName = "GeoJSON"
-    tr_ctx = QgsCoordinateTransformContext()
-    result = QgsVectorFileWriter.writeAsVectorFormatV2(mem, str(out_path), tr_ctx, opts)
 
-    err_code = result[0] if isinstance(result, tuple) else result
-    if err_code != QgsVectorFileWriter.NoError:
-        err_msg = result[1] if (isinstance(result, tuple) and len(result) > 1) else ""
-        raise RuntimeError(f"No se pudo exportar máscara GeoJSON: {err_msg}")
+def _geometries_to_4326(feats, ct: QgsCoordinateTransform):
+    """
+    Lazily reprojects feature geometries to EPSG:4326 with a single transform, one polygon
+    (part) at a time. Yields (i, geom_4326, (minx, miny, maxx, maxy), None), or
+    (i, None, None, error_message) when a feature cannot be reprojected; i numbers polygons.
+    """
+    i = 0
+    for f in feats:
+        try:
+            g = QgsGeometry(f.geometry())
+            g.transform(ct)
+            parts = _polygon_parts(g)
+        except Exception as e:
+            i += 1
+            yield i, None, None, str(e)
+            continue
+        for part in parts:
+            i += 1
+            r = part.boundingBox()
+            yield i, part, (r.xMinimum(), r.yMinimum(), r.xMaximum(), r.yMaximum()), None
 
 
-def _bbox_4326_from_geom(geom: QgsGeometry, src_crs):
+def _bboxes_to_4326(feats, ct: QgsCoordinateTransform):
     """
-    Returns the geometry bounding box transformed to EPSG:4326 as (minx, miny, maxx, maxy).
+    Yields the EPSG:4326 (minx, miny, maxx, maxy) of each polygon (part), or None when a
+    feature cannot be reprojected. Only source bounding boxes are transformed
+    (transformBoundingBox densifies their edges), so the cost is O(1) per polygon however
+    many vertices it has.
     """
-    crs_dst = QgsCoordinateReferenceSystem("EPSG:4326")
-    ct = QgsCoordinateTransform(src_crs, crs_dst, QgsProject.instance().transformContext())
-    g = QgsGeometry(geom)
-    g.transform(ct)
-    r = g.boundingBox()
-    return (r.xMinimum(), r.yMinimum(), r.xMaximum(), r.yMaximum())
+    for f in feats:
+        try:
+            boxes = [
+                ct.transformBoundingBox(part.boundingBox()) for part in _polygon_parts(f.geometry())
+            ]
+        except Exception:
+            yield None
+            continue
+        for r in boxes:
+            yield r.xMinimum(), r.yMinimum(), r.xMaximum(), r.yMaximum()
+
+
+def _clip_to_mask(src_tif: Path, mask_geojson: Path, out_tif: Path) -> None:
+    """
+    Clips a GeoTIFF to a GeoJSON polygon mask with an in-process gdal.Warp (same options as
+    gdal:cliprasterbymasklayer: crop to cutline, keep resolution, nodata, alpha band),
+    avoiding a gdalwarp subprocess per polygon. Output is tiled DEFLATE with the predictor
+    matching the data type (3 for floating-point DEMs, 2 for integers).
+    """
+    src = gdal.Open(str(src_tif))
+    if src is None:
+        raise RuntimeError(f"No se pudo abrir el ráster WCS: {gdal.GetLastErrorMsg()}")
+    gt = src.GetGeoTransform()
+    dtype = src.GetRasterBand(1).DataType
+    predictor = 3 if dtype in (gdal.GDT_Float32, gdal.GDT_Float64) else 2
+    out = gdal.Warp(
+        str(out_tif),
+        src,
+        format="GTiff",
+        options=["-overwrite"],
+        cutlineDSName=str(mask_geojson),
+        cropToCutline=True,
+        xRes=gt[1],
+        yRes=abs(gt[5]),
+        dstNodata=NODATA_VALUE,
+        dstAlpha=True,
+        multithread=True,
+        warpOptions=[f"NUM_THREADS={_WARP_THREADS}"],
+        creationOptions=[
+            "TILED=YES",
+            f"BLOCKXSIZE={CLIP_BLOCK_SIZE}",
+            f"BLOCKYSIZE={CLIP_BLOCK_SIZE}",
+            "COMPRESS=DEFLATE",
+            f"PREDICTOR={predictor}",
+            f"NUM_THREADS={_WARP_THREADS}",
+        ],
+    )
+    src = None
+    if out is None:
+        raise RuntimeError(f"gdal.Warp falló: {gdal.GetLastErrorMsg()}")
+    out = None  # closes and flushes the GeoTIFF
+
+
+def _writable_output_path(out_tif: Path) -> Path:
+    """
+    Clears the output of a previous run so it can be rewritten. When the old file cannot be
+    removed (on Windows it is locked while loaded in the project), returns the first free
+    '<stem>_N.tif' sibling instead.
+    """
+    try:
+        out_tif.unlink(missing_ok=True)
+        return out_tif
+    except OSError:
+        n = 2
+        while True:
+            alt = out_tif.with_name(f"{out_tif.stem}_{n}{out_tif.suffix}")
+            if not alt.exists():
+                return alt
+            n += 1
+
+
+def _process_one(i: int, url, tif_raw: Path, mask_geojson: Path, out_tif: Path):
+    """
+    Worker body for one polygon: fetches the WCS GeoTIFF into its cache path tif_raw
+    (skipped when url is None, i.e. tif_raw is the shared union raster) and clips it to the
+    mask. Raw rasters live only in the size-bounded WCS cache, never next to the outputs.
+    Never touches widgets or the project.
+    Returns (i, out_tif, ok, error_message|None, bytes_added_to_cache).
+    """
+    added = 0
+    try:
+        if url is not None:
+            added = _download_cached(url, tif_raw)
+        _clip_to_mask(tif_raw, mask_geojson, out_tif)
+        return i, out_tif, True, None, added
+    except Exception as e:
+        if url is not None and tif_raw.exists() and not _is_readable_raster(tif_raw):
+            tif_raw.unlink(missing_ok=True)  # never keep an unreadable response cached
+            added = 0
+        return i, out_tif, False, str(e), added
+
+
+def _pad_bbox(bbox, step_deg: float):
+    """
+    Pads an EPSG:4326 bbox by one pixel on each side to avoid edge cuts. The WCS grid is
+    angular (resx == resy == step_deg, in degrees), so one pixel is step_deg along both
+    axes at any latitude; scaling the longitude pad by 1/cos(lat) would over-fetch.
+    """
+    return (bbox[0] - step_deg, bbox[1] - step_deg, bbox[2] + step_deg, bbox[3] + step_deg)
+
+
+def _union_bbox(bboxes):
+    """
+    Returns the (minx, miny, maxx, maxy) envelope of several bboxes.
+    """
+    return (
+        min(b[0] for b in bboxes),
+        min(b[1] for b in bboxes),
+        max(b[2] for b in bboxes),
+        max(b[3] for b in bboxes),
+    )
+
+
+def _bbox_pixels(bbox, step_deg: float) -> float:
+    """
+    Pixel count of a GetCoverage over bbox at step_deg.
+    """
+    return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) / (step_deg * step_deg)
+
+
+def _prefer_union_request(bboxes, step_deg: float) -> bool:
+    """
+    True when one GetCoverage over the union bbox is cheaper than one per polygon: the
+    polygons cluster (union area within UNION_MAX_AREA_RATIO of the summed bbox areas)
+    and the union raster stays under UNION_MAX_PIXELS.
+    """
+    if len(bboxes) < 2:
+        return False
+    union = _union_bbox(bboxes)
+    union_area = (union[2] - union[0]) * (union[3] - union[1])
+    sum_area = sum((b[2] - b[0]) * (b[3] - b[1]) for b in bboxes)
+    return union_area <= UNION_MAX_AREA_RATIO * sum_area and _bbox_pixels(union, step_deg) <= UNION_MAX_PIXELS
 
 
 # ------------------ Public action: one GeoTIFF per polygon ------------------
@@ -224,7 +580,8 @@ def download_poligono_wcs_split_per_polygon(
     res_m: int,
     log_widget: QTextEdit,
     status_label: QLabel = None,
-    progressbar: QProgressBar = None
+    progressbar: QProgressBar = None,
+    strategy: str = "auto"
 ) -> None:
     """
     Downloads CEM via WCS and generates one clipped GeoTIFF per polygon in the input layer.
@@ -233,17 +590,25 @@ def download_poligono_wcs_split_per_polygon(
     Per-polygon pipeline:
       1) Compute EPSG:4326 bbox padded by one pixel step (to avoid edge cuts).
       2) Request GeoTIFF via WCS GetCoverage for that bbox.
-      3) Clip the GeoTIFF to the polygon mask (GeoJSON) using gdal:cliprasterbymasklayer.
+      3) Clip the GeoTIFF to the polygon mask (GeoJSON) with an in-process gdal.Warp.
       4) Load the result in QGIS with Single-band Gray and stretched Min/Max.
+    Steps 2–3 run for up to WCS_MAX_WORKERS polygons at a time on worker threads.
+
+    strategy: "per_polygon" issues one GetCoverage per polygon; "union" issues a single
+    GetCoverage over the union bbox and clips every polygon from it (falling back to
+    "per_polygon" if that raster would exceed UNION_MAX_PIXELS); "auto" picks "union"
+    when the polygons are clustered (see _prefer_union_request).
     """
     if res_m not in VALID_RES:
         raise ValueError("Resolución inválida. Usa 15,30,60,90 o 120 m.")
+    if strategy not in ("auto", "union", "per_polygon"):
+        raise ValueError("Estrategia inválida (usa auto, union o per_polygon).")
 
     single = _explode_to_singleparts(layer)
-    feats = list(single.getFeatures())
-    total = len(feats)
+    total = _count_features(single)
     if total == 0:
         log_append(log_widget, "La capa no contiene polígonos.")
+        log_flush(log_widget)
         return
 
     if status_label and progressbar:
@@ -255,69 +620,157 @@ def download_poligono_wcs_split_per_polygon(
     tmp_root = plugin_temp_dir() / f"wcs_{layer.name()}_{res_m}m"
     tmp_root.mkdir(parents=True, exist_ok=True)
 
-    for i, f in enumerate(feats, start=1):
-        try:
-            geom = f.geometry()
-
-            minx, miny, maxx, maxy = _bbox_4326_from_geom(geom, single.crs())
-            step_deg = meters_to_deg_step(res_m)
-            pad = step_deg
-            bbox = (minx - pad, miny - pad, maxx + pad, maxy + pad)
-
-            url = build_wcs_getcoverage_url(bbox, res_m)
-            log_append(log_widget, f"[{i}/{total}] WCS GetCoverage: {url.toString()}")
-
-            tif_raw = tmp_root / f"wcs_raw_poly_{i:04d}.tif"
-            mask_geojson = tmp_root / f"mask_poly_{i:04d}.geojson"
-            out_tif = tmp_root / f"{layer.name()}__poly{i:04d}__cem_{res_m}m_clip.tif"
-
-            _write_single_polygon_geojson_4326(geom, single.crs(), mask_geojson)
-
+    project = QgsProject.instance()
+    step_deg = meters_to_deg_step(res_m)
+    ct = _transform_to_4326(single.crs(), project)
+    pump = _UiPump()
+    done = 0
+
+    # The union strategy needs every bbox before the first request; only the four
+    # floats per polygon are kept, and only bounding boxes are reprojected here. Full
+    # geometries are reprojected once, later, for the masks.
+    union_bbox = None
+    if strategy != "per_polygon":
+        bboxes = []
+        for bbox_4326 in _bboxes_to_4326(single.getFeatures(), ct):
+            pump()
+            if bbox_4326 is not None:
+                bboxes.append(_pad_bbox(bbox_4326, step_deg))
+        if bboxes and strategy == "union":
+            union_bbox = _union_bbox(bboxes)
+            pixels = _bbox_pixels(union_bbox, step_deg)
+            if pixels > UNION_MAX_PIXELS:
+                log_append(
+                    log_widget,
+                    f"El bbox unión tendría {pixels / 1e6:.0f} Mpx (máximo {UNION_MAX_PIXELS / 1e6:.0f} Mpx); "
+                    "se usa una petición por polígono.",
+                )
+                union_bbox = None
+        elif bboxes and _prefer_union_request(bboxes, step_deg):
+            union_bbox = _union_bbox(bboxes)
+        bboxes = None
+
+    union_raw = None
+    # Cache size is tracked from what workers add, so the directory is only rescanned when
+    # the cap is actually crossed.
+    cache_max = WCS_CACHE_MAX_MB << 20
+    try:
+        cache_used = _sweep_wcs_cache(cache_max)
+    except OSError:
+        cache_used = 0
+
+    def _trim_cache() -> None:
+        # Finished jobs no longer need their raw rasters: keep the cache bounded during the
+        # run, not only after it (the union raster is still needed by pending clips).
+        nonlocal cache_used
+        if cache_used > cache_max:
+            try:
+                cache_used = _sweep_wcs_cache(int(cache_max * WCS_CACHE_TRIM_RATIO), keep=union_raw)
+            except OSError:
+                pass
+
+    def _collect(finished) -> None:
+        # Main thread only: log, load the clipped raster and advance the progress bar.
+        nonlocal done, cache_used
+        for fut in finished:
+            i, out_tif, ok, err, added = fut.result()
+            cache_used += added
+            try:
+                if not ok:
+                    raise RuntimeError(err)
+                if add_raster_gray_with_stats(out_tif, project):
+                    log_append(log_widget, f"[{i}/{total}] OK → {out_tif}")
+                else:
+                    log_append(log_widget, f"[{i}/{total}] Archivo inválido (no cargado): {out_tif}")
+            except Exception as e:
+                log_append(log_widget, f"[{i}/{total}] ERROR: {e}")
+            done += 1
+            if progressbar:
+                progressbar.setValue(done)
+        _trim_cache()
+
+    with ThreadPoolExecutor(max_workers=WCS_MAX_WORKERS) as ex:
+        if union_bbox is not None:
+            # One GetCoverage over the union bbox; every polygon is then clipped from it.
+            url = build_wcs_getcoverage_url(union_bbox, step_deg)
+            union_raw = wcs_cache_path(union_bbox, res_m)
+            if union_raw.exists():
+                log_append(log_widget, f"WCS (caché, bbox unión de {total} polígonos): {union_raw.name}")
+            else:
+                log_append(log_widget, f"WCS GetCoverage (bbox unión de {total} polígonos): {url.toString()}")
             if status_label:
-                status_label.setText(f"[{i}/{total}] Descargando WCS {res_m} m…")
-                QApplication.processEvents()
+                status_label.setText(f"Descargando WCS {res_m} m (bbox unión)…")
+            fut = ex.submit(_download_cached, url, union_raw)
+            while not fut.done():
+                wait([fut], timeout=UI_PUMP_INTERVAL)
+                pump()
+            try:
+                cache_used += fut.result()
+                _trim_cache()
+            except Exception as e:
+                log_append(log_widget, f"Descarga por bbox unión fallida ({e}); se usa una petición por polígono.")
+                union_raw = None
+
+        if status_label:
+            status_label.setText(f"Descargando y recortando {total} polígonos ({WCS_MAX_WORKERS} en paralelo)…")
+        QApplication.processEvents()
 
-            def _cb(br, bt):
-                if status_label:
-                    if bt <= 0:
-                        status_label.setText(f"[{i}/{total}] Descargando… {human_size(br)}")
+        # Bounded producer: features are read, reprojected and masked on demand, and at most
+        # PENDING_PER_WORKER jobs per worker are in flight, so memory stays O(workers).
+        # Workers do network + clip; widgets and the project are only touched here.
+        pending = set()
+        for i, geom_4326, bbox_4326, err in _geometries_to_4326(single.getFeatures(), ct):
+            if i > total:
+                # Multipart features behind a single-part layer type yield extra polygons.
+                total = i
+                if progressbar:
+                    progressbar.setMaximum(total)
+            try:
+                if err:
+                    raise RuntimeError(err)
+
+                mask_geojson = tmp_root / f"mask_poly_{i:04d}.geojson"
+                out_tif = _writable_output_path(tmp_root / f"{layer.name()}__poly{i:04d}__cem_{res_m}m_clip.tif")
+                _write_polygon_geojson_4326(geom_4326, mask_geojson)
+
+                if union_raw is not None:
+                    job = (i, None, union_raw, mask_geojson, out_tif)
+                else:
+                    bbox_req = _pad_bbox(bbox_4326, step_deg)
+                    url = build_wcs_getcoverage_url(bbox_req, step_deg)
+                    tif_raw = wcs_cache_path(bbox_req, res_m)
+                    if tif_raw.exists():
+                        log_append(log_widget, f"[{i}/{total}] WCS (caché): {tif_raw.name}")
                     else:
-                        pct = int(br * 100.0 / max(1, bt))
-                        status_label.setText(f"[{i}/{total}] Descargando… {pct}% ({human_size(br)}/{human_size(bt)})")
-                    QApplication.processEvents()
-
-            http_get_to_file_progress(url, tif_raw, progress_cb=_cb)
-
-            if status_label:
-                status_label.setText(f"[{i}/{total}] Recortando (gdal:cliprasterbymasklayer)…")
-                QApplication.processEvents()
-
-            params = {
-                "INPUT": str(tif_raw),
-                "MASK": str(mask_geojson),
-                "CROP_TO_CUTLINE": True,
-                "KEEP_RESOLUTION": True,
-                "NODATA": NODATA_VALUE,
-                "ALPHA_BAND": True,
-                "OUTPUT": str(out_tif),
-            }
-            processing.run("gdal:cliprasterbymasklayer", params)
-
-            ok = add_raster_gray_with_stats(out_tif)
-            if ok:
-                log_append(log_widget, f"[{i}/{total}] OK → {out_tif}")
-            else:
-                log_append(log_widget, f"[{i}/{total}] Archivo inválido (no cargado): {out_tif}")
-
-        except Exception as e:
-            log_append(log_widget, f"[{i}/{total}] ERROR: {e}")
-
-        finally:
-            if progressbar:
-                progressbar.setValue(i)
-                QApplication.processEvents()
+                        log_append(log_widget, f"[{i}/{total}] WCS GetCoverage: {url.toString()}")
+                    job = (i, url, tif_raw, mask_geojson, out_tif)
+
+            except Exception as e:
+                log_append(log_widget, f"[{i}/{total}] ERROR: {e}")
+                done += 1
+                if progressbar:
+                    progressbar.setValue(done)
+                continue
+
+            while len(pending) >= PENDING_PER_WORKER * WCS_MAX_WORKERS:
+                finished, pending = wait(pending, timeout=UI_PUMP_INTERVAL, return_when=FIRST_COMPLETED)
+                _collect(finished)
+                pump()
+            pending.add(ex.submit(_process_one, *job))
+            pump()
+
+        while pending:
+            finished, pending = wait(pending, timeout=UI_PUMP_INTERVAL, return_when=FIRST_COMPLETED)
+            _collect(finished)
+            pump()
+
+    try:
+        _sweep_wcs_cache(cache_max)
+    except OSError as e:
+        log_append(log_widget, f"No se pudo depurar la caché WCS: {e}")
 
     if status_label and progressbar:
         status_label.setText("Listo. Se generó un TIFF por polígono en TEMP. Guarda copias para conservarlos.")
         QApplication.processEvents()
     log_append(log_widget, "Listo. Resultado en TEMP (un TIFF por polígono).")
+    log_flush(log_widget)